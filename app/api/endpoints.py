@@ -1,14 +1,20 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException, Depends
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+import msgspec
+import orjson
 import time
-from typing import List
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 from app.core.config import settings
 from app.core.logging import get_logger
+from app.api.responses import MsgspecJSONResponse
 from app.models.schemas import (
     PDFProcessResponse,
     ErrorResponse,
     PageResult,
     HealthResponse,
+    ProcessingMetadata,
 )
 from app.services.pdf_processor import PDFProcessor
 from app.services.openai_client import OpenAIClient
@@ -17,18 +23,51 @@ from app.utils.exceptions import PDFProcessingError, create_http_exception
 logger = get_logger(__name__)
 router = APIRouter()
 
+# Shared service instances; the OpenAI client's semaphore and connection pool
+# must be process-wide for the concurrency limit to hold across requests
+_pdf_processor = PDFProcessor()
+_openai_client = OpenAIClient()
+
+
 # Dependency injection
 def get_pdf_processor() -> PDFProcessor:
-    return PDFProcessor()
+    return _pdf_processor
 
 
 def get_openai_client() -> OpenAIClient:
-    return OpenAIClient()
+    return _openai_client
+
+
+def _to_page_result(
+    page_num: int,
+    api_response: Dict[str, Any],
+    metadata: ProcessingMetadata,
+    error: Optional[str],
+) -> PageResult:
+    """Build the response entry for a single processed page."""
+    if error:
+        return PageResult(
+            page_number=page_num,
+            processed_output={},
+            metadata=metadata,
+            error=error,
+        )
+    return PageResult(
+        page_number=page_num,
+        processed_output=api_response,
+        metadata=metadata,
+    )
+
+
+def _sse_event(data: bytes, event: Optional[str] = None) -> bytes:
+    """Format a Server-Sent Events message."""
+    prefix = f"event: {event}\n".encode() if event else b""
+    return prefix + b"data: " + data + b"\n\n"
 
 
 @router.post(
     "/process-pdf",
-    response_model=PDFProcessResponse,
+    response_class=MsgspecJSONResponse,
     responses={
         400: {"model": ErrorResponse},
         413: {"model": ErrorResponse},
@@ -46,7 +85,7 @@ async def process_pdf(
     - **file**: PDF file to upload and process
     - Returns structured JSON with page-by-page processing results
     """
-    start_time = time.time()
+    start_time = time.perf_counter()
 
     try:
         # Validate file type
@@ -59,14 +98,19 @@ async def process_pdf(
             content_type=file.content_type,
         )
 
-        # Extract pages from PDF
-        pages_data = await pdf_processor.process_pdf_stream(file.file)
+        # Spool the upload to disk so MuPDF can read pages on demand
+        pdf_path = await pdf_processor.spool_upload(file)
+        try:
+            # Extract pages from PDF lazily
+            pages = await pdf_processor.process_pdf_stream(pdf_path)
 
-        if not pages_data:
-            raise HTTPException(status_code=400, detail="No pages found in PDF file")
+            # Process pages through OpenAI API as they are rendered
+            api_results = await openai_client.process_batch(pages)
+        finally:
+            pdf_processor.discard_spooled(pdf_path)
 
-        # Process pages through OpenAI API
-        api_results = await openai_client.process_batch(pages_data)
+        if not api_results:
+            raise HTTPException(status_code=400, detail="No pages found in PDF file")
 
         # Prepare response
         results: List[PageResult] = []
@@ -74,44 +118,32 @@ async def process_pdf(
         processed_count = 0
 
         for page_num, api_response, metadata, error in api_results:
+            results.append(_to_page_result(page_num, api_response, metadata, error))
             if error:
                 errors.append(f"Page {page_num}: {error}")
-                results.append(
-                    PageResult(
-                        page_number=page_num,
-                        processed_output={},
-                        metadata=metadata,
-                        error=error,
-                    )
-                )
             else:
                 processed_count += 1
-                results.append(
-                    PageResult(
-                        page_number=page_num,
-                        processed_output=api_response,
-                        metadata=metadata,
-                    )
-                )
 
-        processing_time = time.time() - start_time
+        processing_time = time.perf_counter() - start_time
 
         logger.info(
             "processing_pdf_completed",
             filename=file.filename,
-            total_pages=len(pages_data),
+            total_pages=len(api_results),
             processed_pages=processed_count,
             processing_time=processing_time,
             errors_count=len(errors),
         )
 
-        return PDFProcessResponse(
-            success=len(errors) == 0,
-            total_pages=len(pages_data),
-            processed_pages=processed_count,
-            results=results,
-            processing_time=processing_time,
-            errors=errors if errors else None,
+        return MsgspecJSONResponse(
+            PDFProcessResponse(
+                success=len(errors) == 0,
+                total_pages=len(api_results),
+                processed_pages=processed_count,
+                results=results,
+                processing_time=processing_time,
+                errors=errors if errors else None,
+            )
         )
 
     except PDFProcessingError as e:
@@ -125,6 +157,119 @@ async def process_pdf(
         )
 
 
+@router.post(
+    "/process-pdf/stream",
+    response_class=StreamingResponse,
+    responses={
+        200: {"content": {"text/event-stream": {}}},
+        400: {"model": ErrorResponse},
+        413: {"model": ErrorResponse},
+        500: {"model": ErrorResponse},
+    },
+)
+async def process_pdf_stream(
+    file: UploadFile = File(..., description="PDF file to process"),
+    pdf_processor: PDFProcessor = Depends(get_pdf_processor),
+    openai_client: OpenAIClient = Depends(get_openai_client),
+):
+    """
+    Process a PDF file and stream page results as Server-Sent Events.
+
+    - **file**: PDF file to upload and process
+    - Emits one `data:` event per page, in completion order, as a `PageResult`
+    - Finishes with a `complete` event summarizing the run, or an `error` event
+    """
+    start_time = time.perf_counter()
+
+    if not file.filename.lower().endswith(".pdf"):
+        raise HTTPException(status_code=400, detail="Only PDF files are allowed")
+
+    logger.info(
+        "processing_pdf_stream_started",
+        filename=file.filename,
+        content_type=file.content_type,
+    )
+
+    pdf_path = await pdf_processor.spool_upload(file)
+    try:
+        # Validate before the stream starts so bad uploads get a proper status
+        pages = await pdf_processor.process_pdf_stream(pdf_path)
+
+    except PDFProcessingError as e:
+        pdf_processor.discard_spooled(pdf_path)
+        logger.error("pdf_processing_error", error=str(e), details=e.details)
+        raise create_http_exception(e)
+
+    except BaseException:
+        pdf_processor.discard_spooled(pdf_path)
+        raise
+
+    async def generate() -> AsyncIterator[bytes]:
+        total_pages = 0
+        processed_count = 0
+        errors: List[str] = []
+
+        try:
+            async for page_num, api_response, metadata, error in (
+                openai_client.aiter_batch(pages)
+            ):
+                total_pages += 1
+                if error:
+                    errors.append(f"Page {page_num}: {error}")
+                else:
+                    processed_count += 1
+
+                page_result = _to_page_result(page_num, api_response, metadata, error)
+                yield _sse_event(msgspec.json.encode(page_result))
+
+        except Exception as e:
+            logger.error("unexpected_error", error=str(e))
+            message = (
+                e.message
+                if isinstance(e, PDFProcessingError)
+                else "Internal server error occurred during processing"
+            )
+            yield _sse_event(
+                orjson.dumps({"success": False, "error": message}), event="error"
+            )
+            return
+
+        finally:
+            pdf_processor.discard_spooled(pdf_path)
+
+        processing_time = time.perf_counter() - start_time
+
+        logger.info(
+            "processing_pdf_stream_completed",
+            filename=file.filename,
+            total_pages=total_pages,
+            processed_pages=processed_count,
+            processing_time=processing_time,
+            errors_count=len(errors),
+        )
+
+        yield _sse_event(
+            orjson.dumps(
+                {
+                    "success": len(errors) == 0,
+                    "total_pages": total_pages,
+                    "processed_pages": processed_count,
+                    "processing_time": processing_time,
+                    "errors": errors if errors else None,
+                }
+            ),
+            event="complete",
+        )
+
+    return StreamingResponse(
+        generate(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Also clean up if the stream is abandoned before the generator runs
+        background=BackgroundTask(pdf_processor.discard_spooled, pdf_path),
+    )
+
+
 @router.get("/health", response_model=HealthResponse)
 async def health_check():
     """Health check endpoint."""
@@ -1,6 +1,13 @@
+import os
+from typing import Optional
+
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
+# Default OpenAI tier quotas, shared by all server workers
+DEFAULT_REQUESTS_PER_MINUTE = 3500
+DEFAULT_TOKENS_PER_MINUTE = 90000
+
 
 class Settings(BaseSettings):
     # App settings
@@ -11,22 +18,78 @@ class Settings(BaseSettings):
     # Server settings
     host: str = "0.0.0.0"
     port: int = 8000
+    workers: int = Field(
+        default=1, env="WORKERS"
+    )  # Ignored when debug reload is enabled
 
     # OpenAI API settings
     openai_api_url: str = Field(..., env="OPENAI_API_URL")
     openai_api_key: str = Field(..., env="OPENAI_API_KEY")
     openai_timeout: int = Field(default=30, env="OPENAI_TIMEOUT")
     mmlm_model: str = Field(..., env="MMLM_MODEL")
+    openai_max_requests_per_minute: Optional[int] = Field(
+        default=None, env="OPENAI_MAX_REQUESTS_PER_MINUTE"
+    )  # Per worker, 0 disables; defaults to 3500 split across workers
+    openai_max_tokens_per_minute: Optional[int] = Field(
+        default=None, env="OPENAI_MAX_TOKENS_PER_MINUTE"
+    )  # Per worker, 0 disables; defaults to 90000 split across workers
+    openai_max_retries: int = Field(default=5, env="OPENAI_MAX_RETRIES")
+    openai_retry_initial_delay: float = Field(
+        default=1.0, env="OPENAI_RETRY_INITIAL_DELAY"
+    )
+    openai_retry_max_delay: float = Field(default=30.0, env="OPENAI_RETRY_MAX_DELAY")
 
     # File processing settings
     max_file_size: int = Field(default=50 * 1024 * 1024, env="MAX_FILE_SIZE")  # 50MB
     allowed_extensions: list[str] = [".pdf"]
     image_dpi: int = Field(default=300, env="IMAGE_DPI")
-    image_format: str = Field(default="PNG", env="IMAGE_FORMAT")
+    image_format: str = Field(default="JPEG", env="IMAGE_FORMAT")
+    jpeg_quality: int = Field(default=85, env="JPEG_QUALITY")
+    extract_native_text: bool = Field(default=True, env="EXTRACT_NATIVE_TEXT")
+    native_text_min_chars: int = Field(default=50, env="NATIVE_TEXT_MIN_CHARS")
+    render_workers: Optional[int] = Field(
+        default=None, env="RENDER_WORKERS"
+    )  # Per worker; defaults to the CPU count split across workers
 
     # Processing settings
     max_concurrent_requests: int = Field(default=10, env="MAX_CONCURRENT_REQUESTS")
+    openai_connection_limit: Optional[int] = Field(
+        default=None, env="OPENAI_CONNECTION_LIMIT"
+    )  # Defaults to max_concurrent_requests
+    openai_connection_limit_per_host: Optional[int] = Field(
+        default=None, env="OPENAI_CONNECTION_LIMIT_PER_HOST"
+    )  # Defaults to max_concurrent_requests
     batch_size: int = Field(default=5, env="BATCH_SIZE")
+    thread_pool_size: int = Field(
+        default=min(32, (os.cpu_count() or 1) * 2), env="THREAD_POOL_SIZE"
+    )
+    vision_batch_size: int = Field(
+        default=4, env="VISION_BATCH_SIZE"
+    )  # Pages sent per vision request, 1 disables batching
+    response_cache_size: int = Field(
+        default=256, env="RESPONSE_CACHE_SIZE"
+    )  # Cached responses for identical pages, 0 disables
+
+    @property
+    def render_pool_size(self) -> int:
+        """Render processes for this server worker."""
+        if self.render_workers:
+            return self.render_workers
+        return max(1, (os.cpu_count() or 1) // max(1, self.workers))
+
+    @property
+    def requests_per_minute(self) -> int:
+        """Request quota for this server worker."""
+        if self.openai_max_requests_per_minute is not None:
+            return self.openai_max_requests_per_minute
+        return max(1, DEFAULT_REQUESTS_PER_MINUTE // max(1, self.workers))
+
+    @property
+    def tokens_per_minute(self) -> int:
+        """Token quota for this server worker."""
+        if self.openai_max_tokens_per_minute is not None:
+            return self.openai_max_tokens_per_minute
+        return max(1, DEFAULT_TOKENS_PER_MINUTE // max(1, self.workers))
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,82 @@
+from fastapi import HTTPException
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.logging import get_logger
+
+logger = get_logger(__name__)
+
+
+# Allowance for multipart boundaries and part headers around the uploaded file
+MULTIPART_OVERHEAD = 64 * 1024
+
+
+class MaxBodySizeMiddleware:
+    """Reject uploads larger than ``max_file_size`` before buffering them.
+
+    Requests announcing a too-large ``Content-Length`` are refused immediately;
+    chunked or mis-declared bodies are counted as they stream in and aborted
+    as soon as the running total crosses the limit.
+    """
+
+    def __init__(self, app: ASGIApp, max_file_size: int):
+        self.app = app
+        self.max_file_size = max_file_size
+        # The body limit leaves headroom over the file limit for multipart framing
+        self.max_body_size = max_file_size + MULTIPART_OVERHEAD
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        if content_length is not None and content_length.isdigit():
+            if int(content_length) > self.max_body_size:
+                logger.warning(
+                    "request_body_too_large",
+                    content_length=int(content_length),
+                    max_body_size=self.max_body_size,
+                )
+                await self._reject(scope, receive, send)
+                return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    logger.warning(
+                        "request_body_too_large",
+                        received=received,
+                        max_body_size=self.max_body_size,
+                    )
+                    raise HTTPException(status_code=413, detail=self._detail())
+            return message
+
+        async def tracked_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracked_send)
+        except HTTPException as exc:
+            if exc.status_code != 413 or response_started:
+                raise
+            await self._reject(scope, receive, send)
+
+    def _detail(self) -> str:
+        return f"File size exceeds maximum allowed size of {self.max_file_size} bytes"
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send) -> None:
+        response = JSONResponse(
+            status_code=413, content={"success": False, "error": self._detail()}
+        )
+        await response(scope, receive, send)
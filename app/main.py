@@ -1,11 +1,14 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
+import anyio
 import uvicorn
 
 from app.core.config import settings
 from app.core.logging import setup_logging, get_logger
-from app.api.endpoints import router
+from app.core.middleware import MaxBodySizeMiddleware
+from app.api.endpoints import router, get_openai_client
+from app.services.pdf_processor import start_render_pool, shutdown_render_pool
 from app.utils.exceptions import PDFProcessingError
 
 # Setup logging
@@ -19,8 +22,13 @@ app = FastAPI(
     description="Production-grade PDF processing API with OpenAI integration",
     docs_url="/docs",
     redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
 )
 
+# Reject oversized uploads before they are read into memory. Added before
+# CORS so CORS wraps it and early 413 responses still carry CORS headers.
+app.add_middleware(MaxBodySizeMiddleware, max_file_size=settings.max_file_size)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -54,6 +62,11 @@ async def http_exception_handler(request, exc: HTTPException):
 # Startup event
 @app.on_event("startup")
 async def startup_event():
+    # Bound the threadpool shared by sync endpoints and offloaded blocking calls
+    anyio.to_thread.current_default_thread_limiter().total_tokens = (
+        settings.thread_pool_size
+    )
+    start_render_pool()
     logger.info(
         "application_startup",
         app_name=settings.app_name,
@@ -65,6 +78,8 @@ async def startup_event():
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
+    shutdown_render_pool()
+    await get_openai_client().close()
     logger.info("application_shutdown")
 
 
@@ -74,5 +89,8 @@ if __name__ == "__main__":
         host=settings.host,
         port=settings.port,
         reload=settings.debug,
+        workers=None if settings.debug else settings.workers,
+        loop="uvloop",
+        http="httptools",
         log_config=None,  # Use our custom logging
     )
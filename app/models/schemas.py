@@ -1,9 +1,12 @@
+import msgspec
 from pydantic import BaseModel, Field
-from typing import Optional, List, Any, Dict
+from typing import Annotated, Optional, List, Any, Dict
 from datetime import datetime
 
 
-class ProcessingMetadata(BaseModel):
+# Per-page schemas are msgspec Structs: they are built once per page on the
+# hot path and encoded straight to JSON, without pydantic validation.
+class ProcessingMetadata(msgspec.Struct):
     confidence_score: Optional[float] = None
     processing_time: Optional[float] = None
     image_dimensions: Optional[tuple[int, int]] = None
@@ -11,22 +14,24 @@ class ProcessingMetadata(BaseModel):
     additional_data: Optional[Dict[str, Any]] = None
 
 
-class PageResult(BaseModel):
-    page_number: int = Field(..., ge=1, description="Page number (1-indexed)")
-    processed_output: Dict[str, Any] = Field(
-        ..., description="Response from OpenAI API"
-    )
+class PageResult(msgspec.Struct):
+    page_number: Annotated[
+        int, msgspec.Meta(ge=1, description="Page number (1-indexed)")
+    ]
+    processed_output: Annotated[
+        Dict[str, Any], msgspec.Meta(description="Response from OpenAI API")
+    ]
     metadata: Optional[ProcessingMetadata] = None
     error: Optional[str] = None
 
 
-class PDFProcessResponse(BaseModel):
+class PDFProcessResponse(msgspec.Struct):
     success: bool
     total_pages: int
     processed_pages: int
     results: List[PageResult]
     processing_time: float
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = msgspec.field(default_factory=datetime.utcnow)
     errors: Optional[List[str]] = None
 
 
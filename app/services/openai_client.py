@@ -1,16 +1,180 @@
 import aiohttp
+from aiolimiter import AsyncLimiter
+import orjson
 import asyncio
+import hashlib
+import math
+import random
 import time
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Any, AsyncIterator, Awaitable, Dict, Optional, Union
 import base64
 
 from app.core.config import settings
 from app.core.logging import get_logger
-from app.utils.exceptions import APICallError
+from app.utils.exceptions import APICallError, TransientAPIError
 from app.models.schemas import ProcessingMetadata
+from app.services.pdf_processor import PageContent
 
 logger = get_logger(__name__)
 
+TRANSCRIPTION_INSTRUCTION = (
+    "Please extract and transcribe only the raw text content from the following page image. "
+    "Your response must be formatted in **Markdown**. "
+    "If the image contains tables, convert them into valid Markdown table format. "
+    "Do not add any extra commentary, explanation, or formatting beyond what is in the image."
+)
+BATCH_TRANSCRIPTION_INSTRUCTION = (
+    "Please extract and transcribe only the raw text content from each of the following {count} page images. "
+    "Each image is preceded by its page index. "
+    "Format each transcription in **Markdown**, converting any tables into valid Markdown table format. "
+    "Do not add any extra commentary, explanation, or formatting beyond what is in the images. "
+    'Respond with a single JSON object mapping each page index (as a string, e.g. "1") '
+    "to that page's Markdown transcription, and nothing else."
+)
+MAX_COMPLETION_TOKENS = 1000
+IMAGE_DATA_PLACEHOLDER = "__image_data__"
+
+# Statuses worth retrying: rate limiting and upstream/server failures
+RETRYABLE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Statuses that reject a multi-image request's shape and may succeed per page
+BATCH_REJECTION_STATUSES = frozenset({400, 413, 422})
+
+
+def estimate_request_tokens(image_dimensions: Optional[tuple[int, int]]) -> int:
+    """Estimate the tokens a page request counts against the TPM limit.
+
+    Uses OpenAI's high-detail vision formula (fit within 2048x2048, scale the
+    shortest side to 768, then 170 tokens per 512px tile plus 85 base), plus
+    the prompt text and the completion budget.
+    """
+    image_tokens = 85
+    if image_dimensions:
+        width, height = image_dimensions
+        scale = min(1.0, 2048 / max(width, height))
+        width, height = width * scale, height * scale
+        scale = min(1.0, 768 / min(width, height))
+        width, height = width * scale, height * scale
+        image_tokens += 170 * math.ceil(width / 512) * math.ceil(height / 512)
+
+    prompt_tokens = len(TRANSCRIPTION_INSTRUCTION) // 4
+    return image_tokens + prompt_tokens + MAX_COMPLETION_TOKENS
+
+
+def native_text_response(text: str) -> Dict[str, Any]:
+    """Wrap natively extracted page text in a chat-completion shaped response."""
+    return {
+        "object": "chat.completion",
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"total_tokens": 0},
+    }
+
+
+def parse_batch_transcriptions(
+    response_data: Dict[str, Any], page_count: int
+) -> list[str]:
+    """Split a multi-page response into per-page Markdown, in page order.
+
+    Raises ``ValueError`` when the model did not return the expected JSON.
+    """
+    try:
+        content = response_data["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        raise ValueError("Response has no message content")
+
+    # Models often wrap JSON output in a Markdown code fence
+    content = content.strip()
+    if content.startswith("```"):
+        content = content.split("\n", 1)[-1].rsplit("```", 1)[0]
+
+    transcriptions = orjson.loads(content)
+    if not isinstance(transcriptions, dict):
+        raise ValueError("Response is not a JSON object")
+
+    pages = [transcriptions.get(str(index)) for index in range(1, page_count + 1)]
+    if not all(isinstance(page, str) for page in pages):
+        raise ValueError("Response is missing page transcriptions")
+    return pages
+
+
+def _split_usage(usage: Dict[str, Any], page_count: int) -> list[Dict[str, int]]:
+    """Split a batch response's token usage into per-page shares.
+
+    Each token count is divided evenly, with the remainder going to the first
+    pages, so the shares add up to the batch total.
+    """
+    shares: list[Dict[str, int]] = [{} for _ in range(page_count)]
+    for key, value in usage.items():
+        if not isinstance(value, int):
+            continue
+        share, remainder = divmod(value, page_count)
+        for index, page_usage in enumerate(shares):
+            page_usage[key] = share + (index < remainder)
+    # Keep each page's total consistent with its prompt and completion shares
+    if usage.get("total_tokens") == usage.get("prompt_tokens", 0) + usage.get(
+        "completion_tokens", 0
+    ):
+        for page_usage in shares:
+            page_usage["total_tokens"] = page_usage.get(
+                "prompt_tokens", 0
+            ) + page_usage.get("completion_tokens", 0)
+    return shares
+
+
+def _batch_page_response(
+    response_data: Dict[str, Any], text: str, usage: Dict[str, int]
+) -> Dict[str, Any]:
+    """Build one page's chat-completion shaped response from a batch response."""
+    choice = (response_data.get("choices") or [{}])[0]
+    return {
+        **{
+            key: response_data[key]
+            for key in ("id", "object", "created", "model")
+            if key in response_data
+        },
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": text},
+                "finish_reason": choice.get("finish_reason"),
+            }
+        ],
+        "usage": usage,
+    }
+
+
+def _is_batch_rejection(error: Exception) -> bool:
+    """Whether a failed batch request is worth retrying one request per page.
+
+    That is the case when the response could not be split per page, or the
+    API rejected the shape of the request itself (e.g. too many images or too
+    large a body). Auth, routing and exhausted retries would fail per page too.
+    """
+    if isinstance(error, ValueError):
+        return True
+    return getattr(error, "status_code", None) in BATCH_REJECTION_STATUSES
+
+
+def _parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header given in seconds."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+class _CacheEntryCancelled(Exception):
+    """The request an in-flight cache entry was waiting on was cancelled."""
+
 
 class OpenAIClient:
     """Handles OpenAI API integration."""
@@ -20,153 +184,593 @@ class OpenAIClient:
         self.api_key = settings.openai_api_key
         self.timeout = settings.openai_timeout
         self.mmlm_model = settings.mmlm_model
+        self.image_mime_type = f"image/{settings.image_format.lower()}"
+        self._body_templates: Dict[int, tuple[bytes, ...]] = {}
+        self.vision_batch_size = max(1, settings.vision_batch_size)
+        self.max_retries = max(1, settings.openai_max_retries)
+        self.retry_initial_delay = settings.openai_retry_initial_delay
+        self.retry_max_delay = settings.openai_retry_max_delay
         self.semaphore = asyncio.Semaphore(settings.max_concurrent_requests)
 
+        # Proactive pacing to stay under the provider's RPM / TPM quotas
+        self.request_limiter = (
+            AsyncLimiter(settings.requests_per_minute, 60)
+            if settings.requests_per_minute > 0
+            else None
+        )
+        self.token_limiter = (
+            AsyncLimiter(settings.tokens_per_minute, 60)
+            if settings.tokens_per_minute > 0
+            else None
+        )
+        # Responses keyed by page image hash, shared by identical pages
+        self.response_cache_size = settings.response_cache_size
+        self._response_cache: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_lock = asyncio.Lock()
+
+    def _body_template(self, image_count: int) -> tuple[bytes, ...]:
+        """Serialized request payload for ``image_count`` images, split at the image data.
+
+        The page images are the only part of the payload that changes between
+        requests, so the JSON around them is encoded once per image count and
+        base64 bytes are spliced in per request (base64 never needs JSON
+        escaping).
+        """
+        template = self._body_templates.get(image_count)
+        if template is not None:
+            return template
+
+        if image_count == 1:
+            content = [
+                {"type": "text", "text": TRANSCRIPTION_INSTRUCTION},
+                {"type": "image_url", "image_url": {"url": IMAGE_DATA_PLACEHOLDER}},
+            ]
+        else:
+            content = [
+                {
+                    "type": "text",
+                    "text": BATCH_TRANSCRIPTION_INSTRUCTION.format(count=image_count),
+                }
+            ]
+            for index in range(1, image_count + 1):
+                content.append({"type": "text", "text": f"Page index {index}:"})
+                content.append(
+                    {"type": "image_url", "image_url": {"url": IMAGE_DATA_PLACEHOLDER}}
+                )
+
+        payload = {
+            "model": self.mmlm_model,
+            "messages": [{"role": "user", "content": content}],
+            "max_tokens": MAX_COMPLETION_TOKENS * image_count,
+        }
+        data_url_prefix = f"data:{self.image_mime_type};base64,".encode()
+        *segments, suffix = orjson.dumps(payload).split(IMAGE_DATA_PLACEHOLDER.encode())
+        template = (*(segment + data_url_prefix for segment in segments), suffix)
+        self._body_templates[image_count] = template
+        return template
+
+    def _build_body(self, images: list[bytes]) -> bytes:
+        """Build the request body around the base64 bytes of ``images``."""
+        template = self._body_template(len(images))
+        parts = [template[0]]
+        for image_data, segment in zip(images, template[1:]):
+            parts.append(base64.b64encode(image_data))
+            parts.append(segment)
+        return b"".join(parts)
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared HTTP session, creating it on first use."""
+        if self._session is None or self._session.closed:
+            async with self._session_lock:
+                if self._session is None or self._session.closed:
+                    # Size the pool to match the semaphore so requests can't
+                    # pile up as extra connections to a single backend
+                    connector = aiohttp.TCPConnector(
+                        limit=settings.openai_connection_limit
+                        or settings.max_concurrent_requests,
+                        limit_per_host=settings.openai_connection_limit_per_host
+                        or settings.max_concurrent_requests,
+                        keepalive_timeout=60,
+                    )
+                    self._session = aiohttp.ClientSession(
+                        connector=connector,
+                        timeout=aiohttp.ClientTimeout(total=self.timeout),
+                    )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
     async def process_image(
         self, image_data: bytes, page_number: int, metadata: ProcessingMetadata
     ) -> tuple[Dict[str, Any], ProcessingMetadata]:
-        """Send image to OpenAI API and return response."""
+        """Send image to OpenAI API and return response.
+
+        Identical page images share a single API call: the response (or the
+        in-flight request) is cached under a hash of the image bytes.
+        """
+        start_time = time.perf_counter()
 
-        async with self.semaphore:
-            start_time = time.time()
+        cache_key = self._cache_key(image_data)
+        while True:
+            cached = self._response_cache.get(cache_key) if cache_key else None
+            if cached is None:
+                future = self._claim_cache_entry(cache_key)
+                response_data, attempt = await self._resolve_cache_entry(
+                    cache_key,
+                    future,
+                    self._request_with_retries(
+                        self._build_body([image_data]),
+                        page_number,
+                        estimate_request_tokens(metadata.image_dimensions),
+                    ),
+                )
+                break
 
+            self._response_cache.move_to_end(cache_key)
+            logger.info("api_cache_hit", page_number=page_number)
             try:
-                # Encode image as base64
-                image_b64 = base64.b64encode(image_data).decode("utf-8")
-                instruction = (
-                    "Please extract and transcribe only the raw text content from the following page image. "
-                    "Your response must be formatted in **Markdown**. "
-                    "If the image contains tables, convert them into valid Markdown table format. "
-                    "Do not add any extra commentary, explanation, or formatting beyond what is in the image."
+                response_data = await asyncio.shield(cached)
+            except _CacheEntryCancelled:
+                # The page that owned the request was cancelled; send it ourselves
+                logger.info("api_cache_entry_cancelled", page_number=page_number)
+                continue
+            attempt = 0
+            break
+
+        return response_data, self._page_metadata(
+            metadata,
+            page_number,
+            start_time,
+            response_data,
+            attempt,
+            cached is not None,
+        )
+
+    async def process_images(
+        self, pages: list[tuple[int, bytes, ProcessingMetadata]]
+    ) -> tuple[list[Dict[str, Any]], int]:
+        """Send several page images in one request and split the response per page.
+
+        Returns the per-page responses and the number of attempts made. Each
+        page's ``usage`` is its share of the batch's token usage.
+
+        Raises ``APICallError`` if the request fails and ``ValueError`` if the
+        response cannot be split into one transcription per page.
+        """
+        response_data, attempt = await self._request_with_retries(
+            self._build_body([image_data for _, image_data, _ in pages]),
+            [page_num for page_num, _, _ in pages],
+            sum(
+                estimate_request_tokens(metadata.image_dimensions)
+                for _, _, metadata in pages
+            ),
+        )
+        transcriptions = parse_batch_transcriptions(response_data, len(pages))
+        usages = _split_usage(response_data.get("usage", {}), len(pages))
+        return [
+            _batch_page_response(response_data, text, usage)
+            for text, usage in zip(transcriptions, usages)
+        ], attempt
+
+    def _page_metadata(
+        self,
+        metadata: ProcessingMetadata,
+        page_number: int,
+        start_time: float,
+        response_data: Dict[str, Any],
+        attempt: int,
+        cache_hit: bool,
+        batch_pages: Optional[list[int]] = None,
+    ) -> ProcessingMetadata:
+        """Update page metadata in place with API call info.
+
+        For pages sent in a multi-page request, ``batch_pages`` lists the pages
+        that shared it and the token count is this page's share of its usage.
+        Cache hits made no API call, so they report no tokens used and keep the
+        cached response's count under ``cached_response_tokens``.
+        """
+        api_processing_time = time.perf_counter() - start_time
+        response_tokens = response_data.get("usage", {}).get("total_tokens", 0)
+        tokens_used = 0 if cache_hit else response_tokens
+
+        logger.info(
+            "api_request_successful",
+            page_number=page_number,
+            processing_time=api_processing_time,
+            tokens_used=tokens_used,
+        )
+
+        metadata.processing_time = (metadata.processing_time or 0) + api_processing_time
+        metadata.additional_data = {
+            **(metadata.additional_data or {}),
+            "api_processing_time": api_processing_time,
+            "api_response_tokens": tokens_used,
+            "api_attempts": attempt,
+            "api_batch_size": len(batch_pages) if batch_pages else 1,
+            "api_batch_pages": batch_pages,
+            "api_tokens_shared": bool(batch_pages),
+            "cache_hit": cache_hit,
+            "cached_response_tokens": response_tokens if cache_hit else 0,
+        }
+        return metadata
+
+    async def _request_with_retries(
+        self,
+        body: bytes,
+        page_number: Union[int, list[int]],
+        estimated_tokens: int,
+    ) -> tuple[Dict[str, Any], int]:
+        """Send a request body, retrying transient failures. Returns the attempt count."""
+        # Retry transient failures with exponential backoff, sleeping outside
+        # the semaphore so waiting pages don't hold a concurrency slot
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                await self._acquire_rate_limit(estimated_tokens)
+                async with self.semaphore:
+                    response_data = await self._send_request(body, page_number)
+                return response_data, attempt
+            except TransientAPIError as e:
+                if attempt >= self.max_retries:
+                    logger.error(
+                        "api_request_failed", page_number=page_number, error=str(e)
+                    )
+                    raise APICallError(
+                        f"{e.message} (gave up after {attempt} attempts)"
+                    )
+
+                delay = self._retry_delay(attempt, e.retry_after)
+                logger.warning(
+                    "api_request_retry",
+                    page_number=page_number,
+                    attempt=attempt,
+                    delay=delay,
+                    error=str(e),
                 )
-                # Prepare request payload
-                payload = {
-                    "model": self.mmlm_model,
-                    "messages": [
-                        {
-                            "role": "user",
-                            "content": [
-                                {"type": "text", "text": instruction},
-                                {
-                                    "type": "image_url",
-                                    "image_url": {
-                                        "url": f"data:image/png;base64,{image_b64}"
-                                    },
-                                },
-                            ],
-                        }
-                    ],
-                    "max_tokens": 1000,
-                }
+                await asyncio.sleep(delay)
 
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "Content-Type": "application/json",
-                }
+    def _claim_cache_entry(self, cache_key: Optional[str]) -> Optional[asyncio.Future]:
+        """Register an in-flight response future that identical pages can await."""
+        if cache_key is None:
+            return None
+        future = asyncio.get_running_loop().create_future()
+        self._cache_response(cache_key, future)
+        return future
+
+    async def _resolve_cache_entry(
+        self,
+        cache_key: Optional[str],
+        future: Optional[asyncio.Future],
+        request: Awaitable[tuple[Dict[str, Any], int]],
+    ) -> tuple[Dict[str, Any], int]:
+        """Await ``request`` and publish its response to ``future``."""
+        try:
+            response_data, attempt = await request
+        except BaseException as e:
+            self._fail_cache_entry(cache_key, future, e)
+            raise
+
+        if future is not None:
+            future.set_result(response_data)
+        return response_data, attempt
 
-                # Make API request
-                async with aiohttp.ClientSession(
-                    timeout=aiohttp.ClientTimeout(total=self.timeout)
-                ) as session:
-                    logger.info(
-                        "sending_api_request", page_number=page_number, url=self.api_url
+    def _fail_cache_entry(
+        self,
+        cache_key: Optional[str],
+        future: Optional[asyncio.Future],
+        error: BaseException,
+    ) -> None:
+        """Evict a failed in-flight entry and pass the error to its waiters.
+
+        A cancelled owner is not a failure of the request itself, so its
+        waiters get ``_CacheEntryCancelled`` and re-claim the entry instead.
+        """
+        if future is None or future.done():
+            return
+        if self._response_cache.get(cache_key) is future:
+            del self._response_cache[cache_key]
+        future.set_exception(
+            error if isinstance(error, Exception) else _CacheEntryCancelled()
+        )
+        # Mark retrieved; pages waiting on it re-raise it themselves
+        future.exception()
+
+    def _cache_key(self, image_data: bytes) -> Optional[str]:
+        """Hash page image bytes for response deduplication."""
+        if self.response_cache_size <= 0:
+            return None
+        return hashlib.blake2b(image_data, digest_size=16).hexdigest()
+
+    def _cache_response(self, cache_key: str, future: asyncio.Future) -> None:
+        """Store a response future, evicting the least recently used entries."""
+        self._response_cache[cache_key] = future
+        while len(self._response_cache) > self.response_cache_size:
+            self._response_cache.popitem(last=False)
+
+    async def _send_request(
+        self, body: bytes, page_number: Union[int, list[int]]
+    ) -> Dict[str, Any]:
+        """Make a single API request, classifying failures as transient or not."""
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json",
+        }
+
+        try:
+            # Make API request over the shared connection pool
+            session = await self._get_session()
+            logger.info(
+                "sending_api_request", page_number=page_number, url=self.api_url
+            )
+
+            async with session.post(
+                self.api_url, data=body, headers=headers
+            ) as response:
+                if response.status == 200:
+                    return await response.json(loads=orjson.loads)
+
+                try:
+                    response_data = await response.json(content_type=None)
+                    error_msg = response_data.get("error", {}).get(
+                        "message", "Unknown API error"
                     )
+                except Exception:
+                    error_msg = response.reason or "Unknown API error"
 
-                    async with session.post(
-                        self.api_url, json=payload, headers=headers
-                    ) as response:
-                        response_data = await response.json()
-
-                        if response.status != 200:
-                            error_msg = response_data.get("error", {}).get(
-                                "message", "Unknown API error"
-                            )
-                            raise APICallError(
-                                f"OpenAI API request failed: {error_msg}"
-                            )
-
-                        # Update metadata with API call info
-                        api_processing_time = time.time() - start_time
-                        updated_metadata = ProcessingMetadata(
-                            confidence_score=metadata.confidence_score,
-                            processing_time=metadata.processing_time
-                            + api_processing_time,
-                            image_dimensions=metadata.image_dimensions,
-                            file_size=metadata.file_size,
-                            additional_data={
-                                **(metadata.additional_data or {}),
-                                "api_processing_time": api_processing_time,
-                                "api_response_tokens": response_data.get(
-                                    "usage", {}
-                                ).get("total_tokens", 0),
-                            },
-                        )
+                message = f"OpenAI API request failed ({response.status}): {error_msg}"
+                if response.status in RETRYABLE_STATUSES:
+                    raise TransientAPIError(
+                        message,
+                        retry_after=_parse_retry_after(
+                            response.headers.get("Retry-After")
+                        ),
+                    )
+                raise APICallError(message, status_code=response.status)
 
-                        logger.info(
-                            "api_request_successful",
-                            page_number=page_number,
-                            processing_time=api_processing_time,
-                            tokens_used=response_data.get("usage", {}).get(
-                                "total_tokens", 0
-                            ),
-                        )
+        except APICallError:
+            raise
+        except asyncio.TimeoutError:
+            raise TransientAPIError(
+                f"API request timed out after {self.timeout} seconds"
+            )
+        except aiohttp.ClientError as e:
+            raise TransientAPIError(f"Network error during API request: {str(e)}")
+        except Exception as e:
+            logger.error("api_request_failed", page_number=page_number, error=str(e))
+            raise APICallError(f"Unexpected error during API request: {str(e)}")
 
-                        return response_data, updated_metadata
+    async def _acquire_rate_limit(self, estimated_tokens: int) -> None:
+        """Wait until the request and token budgets allow another request."""
+        if self.request_limiter is not None:
+            await self.request_limiter.acquire()
+        if self.token_limiter is not None:
+            await self.token_limiter.acquire(
+                min(estimated_tokens, self.token_limiter.max_rate)
+            )
 
-            except asyncio.TimeoutError:
-                raise APICallError(
-                    f"API request timed out after {self.timeout} seconds"
-                )
-            except aiohttp.ClientError as e:
-                raise APICallError(f"Network error during API request: {str(e)}")
-            except Exception as e:
-                logger.error(
-                    "api_request_failed", page_number=page_number, error=str(e)
-                )
-                raise APICallError(f"Unexpected error during API request: {str(e)}")
+    def _retry_delay(self, attempt: int, retry_after: Optional[float]) -> float:
+        """Seconds to wait before the next attempt, capped at ``retry_max_delay``."""
+        if retry_after is not None:
+            return min(retry_after, self.retry_max_delay)
+        backoff = min(
+            self.retry_max_delay, self.retry_initial_delay * 2 ** (attempt - 1)
+        )
+        return random.uniform(0, backoff)
 
-    async def process_batch(
-        self, pages_data: list[tuple[int, bytes, ProcessingMetadata]]
-    ) -> list[tuple[int, Dict[str, Any], ProcessingMetadata, Optional[str]]]:
-        """Process multiple pages concurrently."""
+    async def aiter_batch(
+        self, pages: AsyncIterator[tuple[int, PageContent, ProcessingMetadata]]
+    ) -> AsyncIterator[tuple[int, Dict[str, Any], ProcessingMetadata, Optional[str]]]:
+        """Dispatch pages as they arrive and yield results as they complete.
 
-        logger.info("starting_batch_processing", total_pages=len(pages_data))
+        Pages that arrive as native text are passed through without an API call.
+        Image pages are grouped into requests of up to ``vision_batch_size``.
+        """
+        pending: set[asyncio.Task] = set()
+        group: list[tuple[int, bytes, ProcessingMetadata]] = []
 
-        # Create tasks for concurrent processing
-        tasks = []
-        for page_num, image_data, metadata in pages_data:
-            task = self._process_single_page(page_num, image_data, metadata)
-            tasks.append(task)
+        try:
+            async for page_num, image_data, metadata in pages:
+                if isinstance(image_data, str):
+                    yield page_num, native_text_response(image_data), metadata, None
+                else:
+                    group.append((page_num, image_data, metadata))
+                    if len(group) >= self.vision_batch_size:
+                        pending.add(
+                            asyncio.create_task(self._process_page_group(group))
+                        )
+                        group = []
 
-        # Process with controlled concurrency
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+                # Stop pulling pages once the concurrency window is full
+                if len(pending) >= settings.max_concurrent_requests:
+                    done, pending = await asyncio.wait(
+                        pending, return_when=asyncio.FIRST_COMPLETED
+                    )
+                else:
+                    # Hand back groups that finished while this page rendered
+                    done = {task for task in pending if task.done()}
+                    pending -= done
+                for task in done:
+                    for result in task.result():
+                        yield result
 
-        # Handle results and exceptions
-        processed_results = []
-        for i, result in enumerate(results):
-            page_num = pages_data[i][0]
+            if group:
+                pending.add(asyncio.create_task(self._process_page_group(group)))
 
-            if isinstance(result, Exception):
-                error_msg = str(result)
-                logger.error(
-                    "page_processing_failed", page_number=page_num, error=error_msg
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
                 )
-                processed_results.append((page_num, {}, pages_data[i][2], error_msg))
-            else:
-                processed_results.append((*result, None))
+                for task in done:
+                    for result in task.result():
+                        yield result
+
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def process_batch(
+        self, pages: AsyncIterator[tuple[int, PageContent, ProcessingMetadata]]
+    ) -> list[tuple[int, Dict[str, Any], ProcessingMetadata, Optional[str]]]:
+        """Process pages concurrently as they are produced."""
+
+        logger.info("starting_batch_processing")
+
+        processed_results = [result async for result in self.aiter_batch(pages)]
+        processed_results.sort(key=lambda result: result[0])
 
         logger.info("batch_processing_complete", total_pages=len(processed_results))
         return processed_results
 
     async def _process_single_page(
         self, page_num: int, image_data: bytes, metadata: ProcessingMetadata
-    ) -> tuple[int, Dict[str, Any], ProcessingMetadata]:
+    ) -> tuple[int, Dict[str, Any], ProcessingMetadata, Optional[str]]:
         """Process a single page with error handling."""
         try:
             api_response, updated_metadata = await self.process_image(
                 image_data, page_num, metadata
             )
-            return page_num, api_response, updated_metadata
+            return page_num, api_response, updated_metadata, None
         except Exception as e:
-            # Re-raise to be caught by gather
-            raise e
+            error_msg = str(e)
+            logger.error(
+                "page_processing_failed", page_number=page_num, error=error_msg
+            )
+            return page_num, {}, metadata, error_msg
+
+    async def _process_page_group(
+        self, group: list[tuple[int, bytes, ProcessingMetadata]]
+    ) -> list[tuple[int, Dict[str, Any], ProcessingMetadata, Optional[str]]]:
+        """Process a group of pages with one multi-image request.
+
+        Pages whose response is already cached or in flight (including
+        duplicates within the group) go through the per-page path to share
+        that response. If the batch request is rejected or its response cannot
+        be split per page, the batched pages are retried one request per page.
+        """
+        if len(group) == 1:
+            return [await self._process_single_page(*group[0])]
+
+        batch: list[tuple[int, bytes, ProcessingMetadata]] = []
+        futures: list[tuple[Optional[str], Optional[asyncio.Future]]] = []
+        shared: list[tuple[int, bytes, ProcessingMetadata]] = []
+        for page in group:
+            cache_key = self._cache_key(page[1])
+            if cache_key is not None and cache_key in self._response_cache:
+                shared.append(page)
+            else:
+                batch.append(page)
+                futures.append((cache_key, self._claim_cache_entry(cache_key)))
+
+        results = await asyncio.gather(
+            self._process_batched_pages(batch, futures),
+            *(self._process_single_page(*page) for page in shared),
+        )
+        return [*results[0], *results[1:]]
+
+    async def _process_batched_pages(
+        self,
+        batch: list[tuple[int, bytes, ProcessingMetadata]],
+        futures: list[tuple[Optional[str], Optional[asyncio.Future]]],
+    ) -> list[tuple[int, Dict[str, Any], ProcessingMetadata, Optional[str]]]:
+        """Send ``batch`` as one request, publishing each page's response to its future."""
+        start_time = time.perf_counter()
+
+        if len(batch) > 1:
+            batch_pages = [page_num for page_num, _, _ in batch]
+            try:
+                responses, attempt = await self.process_images(batch)
+            except Exception as e:
+                if not _is_batch_rejection(e):
+                    error_msg = str(e)
+                    logger.error(
+                        "page_processing_failed",
+                        page_number=batch_pages,
+                        error=error_msg,
+                    )
+                    for cache_key, future in futures:
+                        self._fail_cache_entry(cache_key, future, e)
+                    return [
+                        (page_num, {}, metadata, error_msg)
+                        for page_num, _, metadata in batch
+                    ]
+                logger.warning(
+                    "batch_request_failed_falling_back",
+                    page_numbers=batch_pages,
+                    error=str(e),
+                )
+            except BaseException as e:
+                for cache_key, future in futures:
+                    self._fail_cache_entry(cache_key, future, e)
+                raise
+            else:
+                results = []
+                for (page_num, _, metadata), response_data, (_, future) in zip(
+                    batch, responses, futures
+                ):
+                    if future is not None:
+                        future.set_result(response_data)
+                    results.append(
+                        (
+                            page_num,
+                            response_data,
+                            self._page_metadata(
+                                metadata,
+                                page_num,
+                                start_time,
+                                response_data,
+                                attempt,
+                                False,
+                                batch_pages=batch_pages,
+                            ),
+                            None,
+                        )
+                    )
+                return results
+
+        return list(
+            await asyncio.gather(
+                *(
+                    self._process_claimed_page(page, cache_key, future)
+                    for page, (cache_key, future) in zip(batch, futures)
+                )
+            )
+        )
+
+    async def _process_claimed_page(
+        self,
+        page: tuple[int, bytes, ProcessingMetadata],
+        cache_key: Optional[str],
+        future: Optional[asyncio.Future],
+    ) -> tuple[int, Dict[str, Any], ProcessingMetadata, Optional[str]]:
+        """Send a single page whose cache entry this caller already owns."""
+        page_num, image_data, metadata = page
+        start_time = time.perf_counter()
+        try:
+            response_data, attempt = await self._resolve_cache_entry(
+                cache_key,
+                future,
+                self._request_with_retries(
+                    self._build_body([image_data]),
+                    page_num,
+                    estimate_request_tokens(metadata.image_dimensions),
+                ),
+            )
+        except Exception as e:
+            error_msg = str(e)
+            logger.error(
+                "page_processing_failed", page_number=page_num, error=error_msg
+            )
+            return page_num, {}, metadata, error_msg
+
+        return (
+            page_num,
+            response_data,
+            self._page_metadata(
+                metadata, page_num, start_time, response_data, attempt, False
+            ),
+            None,
+        )
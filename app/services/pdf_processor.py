@@ -1,10 +1,14 @@
+import anyio
+import asyncio
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 import fitz  # PyMuPDF
-import aiofiles
 import tempfile
-import os
-from PIL import Image
-from typing import List, Tuple, BinaryIO
-from io import BytesIO
+from fastapi import UploadFile
+from typing import AsyncIterator, Deque, Optional, Tuple, Union
 import time
 
 from app.core.config import settings
@@ -14,6 +18,112 @@ from app.models.schemas import ProcessingMetadata
 
 logger = get_logger(__name__)
 
+# Page payload: rendered image bytes to transcribe, or native text already
+# extracted from the PDF
+PageContent = Union[bytes, str]
+
+# Read size used when spooling uploads to disk
+UPLOAD_CHUNK_SIZE = 1 << 20
+
+# Pages whose raster images cover more than this share still go through vision
+SIGNIFICANT_IMAGE_AREA_RATIO = 0.1
+
+# Process pool used for CPU-bound page rendering, managed by the app lifecycle
+_render_pool: Optional[ProcessPoolExecutor] = None
+
+
+def start_render_pool() -> None:
+    """Create the process pool used for page rendering.
+
+    Workers are started lazily, while the server already runs threads (the
+    event loop, anyio workers inside MuPDF), so they come from a forkserver
+    rather than a fork of this process.
+    """
+    global _render_pool
+    if _render_pool is None:
+        _render_pool = ProcessPoolExecutor(
+            max_workers=settings.render_pool_size,
+            mp_context=multiprocessing.get_context("forkserver"),
+        )
+
+
+def shutdown_render_pool() -> None:
+    """Shut down the page rendering process pool."""
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown(cancel_futures=True)
+        _render_pool = None
+
+
+def _page_count(pdf_path: str) -> int:
+    """Open the PDF just long enough to count its pages."""
+    doc = fitz.open(pdf_path, filetype="pdf")
+    try:
+        return doc.page_count
+    finally:
+        doc.close()
+
+
+@lru_cache(maxsize=None)
+def _render_matrix(dpi: int) -> fitz.Matrix:
+    """Transformation matrix for rendering at ``dpi``, built once per worker."""
+    return fitz.Matrix(dpi / 72, dpi / 72)
+
+
+def _has_significant_images(page: fitz.Page) -> bool:
+    """Whether raster images cover a meaningful share of the page."""
+    page_area = abs(page.rect)
+    image_area = sum(
+        abs(fitz.Rect(info["bbox"]) & page.rect) for info in page.get_image_info()
+    )
+    return image_area > page_area * SIGNIFICANT_IMAGE_AREA_RATIO
+
+
+def _render_page(
+    pdf_path: str,
+    page_idx: int,
+    dpi: int,
+    fmt: str,
+    quality: int,
+    native_text_min_chars: Optional[int],
+) -> Tuple[PageContent, Optional[Tuple[int, int]], float]:
+    """Render a single page to image bytes. Runs inside a worker process.
+
+    The document is opened from its path so MuPDF reads only the objects the
+    page needs, and the PDF itself is never pickled across to the worker.
+
+    When ``native_text_min_chars`` is set and the page carries at least that
+    much selectable text and no significant raster images, the extracted text
+    is returned instead and the page is not rendered at all.
+    """
+    page_start = time.perf_counter()
+
+    doc = fitz.open(pdf_path, filetype="pdf")
+    try:
+        page = doc.load_page(page_idx)
+
+        if native_text_min_chars is not None:
+            text = page.get_text("text").strip()
+            if len(text) >= native_text_min_chars and not _has_significant_images(page):
+                return text, None, time.perf_counter() - page_start
+
+        # Render page as pixmap
+        pix = page.get_pixmap(matrix=_render_matrix(dpi), alpha=False)
+
+        # Encode directly from the pixmap, avoiding a second encode pass
+        if fmt == "JPEG":
+            image_bytes = pix.tobytes("jpeg", jpg_quality=quality)
+        else:
+            image_bytes = pix.tobytes(fmt.lower())
+        width, height = pix.width, pix.height
+
+        # Release the pixmap buffer before the document is closed
+        del pix
+    finally:
+        doc.close()
+
+    return image_bytes, (width, height), time.perf_counter() - page_start
+
 
 class PDFProcessor:
     """Handles PDF parsing and image conversion."""
@@ -21,137 +131,160 @@ class PDFProcessor:
     def __init__(self):
         self.dpi = settings.image_dpi
         self.image_format = settings.image_format.upper()
+        self.jpeg_quality = settings.jpeg_quality
+        self.native_text_min_chars = (
+            settings.native_text_min_chars if settings.extract_native_text else None
+        )
+
+    async def spool_upload(self, file: UploadFile) -> str:
+        """Copy an upload to a temporary file and return its path.
+
+        The caller owns the file and must remove it with ``discard_spooled``.
+        """
+        tmp_file = await anyio.to_thread.run_sync(
+            partial(tempfile.NamedTemporaryFile, suffix=".pdf", delete=False)
+        )
+        try:
+            # Copy in chunks so the whole upload is never held in memory
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await anyio.to_thread.run_sync(tmp_file.write, chunk)
+        except BaseException:
+            tmp_file.close()
+            self.discard_spooled(tmp_file.name)
+            raise
+
+        await anyio.to_thread.run_sync(tmp_file.close)
+        return tmp_file.name
 
-    async def validate_pdf(self, file_content: bytes) -> None:
+    def discard_spooled(self, pdf_path: str) -> None:
+        """Remove a file created by ``spool_upload``."""
+        try:
+            os.unlink(pdf_path)
+        except OSError:
+            pass
+
+    async def validate_pdf(self, pdf_path: str) -> None:
         """Validate PDF file."""
-        if len(file_content) > settings.max_file_size:
+        if os.path.getsize(pdf_path) > settings.max_file_size:
             raise PDFProcessingError(
                 f"File size exceeds maximum allowed size of {settings.max_file_size} bytes"
             )
 
+        # Opening the PDF parses it synchronously, so keep it off the event loop
+        await anyio.to_thread.run_sync(self._validate_sync, pdf_path)
+
+    def _validate_sync(self, pdf_path: str) -> None:
+        """Check that the file opens as a PDF with at least one page."""
         try:
             # Test if file can be opened as PDF
-            doc = fitz.open(stream=file_content, filetype="pdf")
-            if doc.page_count == 0:
-                raise InvalidFileError("PDF file contains no pages")
-            doc.close()
+            page_count = _page_count(pdf_path)
         except Exception as e:
-            raise InvalidFileError(f"Invalid PDF file: {str(e)}")
-
-    async def extract_pages_as_images(
-        self, file_content: bytes
-    ) -> List[Tuple[int, bytes, ProcessingMetadata]]:
-        """Extract all pages from PDF as high-quality images."""
-        start_time = time.time()
+            # MuPDF errors name the spooled temp file; keep them out of responses
+            logger.warning("invalid_pdf", error=str(e))
+            raise InvalidFileError("Invalid PDF file: not a valid PDF")
+        if page_count == 0:
+            raise InvalidFileError("Invalid PDF file: PDF file contains no pages")
+
+    async def aiter_pages_as_images(
+        self, pdf_path: str
+    ) -> AsyncIterator[Tuple[int, PageContent, ProcessingMetadata]]:
+        """Yield PDF pages in order as high-quality images, or as native text.
+
+        Pages are rendered in the render process pool, keeping a bounded
+        window of renders in flight so the event loop never blocks on MuPDF.
+        PyMuPDF is not thread-safe, so there is no thread pool fallback.
+        """
+        render_pool = _render_pool
+        if render_pool is None:
+            raise RuntimeError("Render pool is not running; call start_render_pool()")
+
+        start_time = time.perf_counter()
+        loop = asyncio.get_running_loop()
 
         try:
-            doc = fitz.open(stream=file_content, filetype="pdf")
-            pages_data = []
-
-            logger.info("extracting_pdf_pages", total_pages=doc.page_count)
-
-            # Process pages in batches to manage memory
-            for page_num in range(doc.page_count):
-                page_start = time.time()
-
-                page = doc.load_page(page_num)
-
-                # Create transformation matrix for high DPI
-                mat = fitz.Matrix(self.dpi / 72, self.dpi / 72)
+            page_count = await anyio.to_thread.run_sync(_page_count, pdf_path)
+        except Exception as e:
+            logger.error("pdf_extraction_failed", error=str(e))
+            raise PDFProcessingError("Failed to extract pages from PDF")
 
-                # Render page as pixmap
-                pix = page.get_pixmap(matrix=mat, alpha=False)
+        logger.info("extracting_pdf_pages", total_pages=page_count)
 
-                # Convert to PIL Image for better compression
-                img_data = pix.tobytes("png")
-                pil_image = Image.open(BytesIO(img_data))
+        window = settings.render_pool_size
+        in_flight: Deque[asyncio.Future] = deque()
+        next_page = 0
 
-                # Optimize image
-                output_buffer = BytesIO()
-                pil_image.save(
-                    output_buffer,
-                    format=self.image_format,
-                    optimize=True,
-                    quality=95 if self.image_format == "JPEG" else None,
-                )
-
-                image_bytes = output_buffer.getvalue()
+        try:
+            while next_page < page_count or in_flight:
+                # Keep the render window full
+                while next_page < page_count and len(in_flight) < window:
+                    in_flight.append(
+                        loop.run_in_executor(
+                            render_pool,
+                            _render_page,
+                            pdf_path,
+                            next_page,
+                            self.dpi,
+                            self.image_format,
+                            self.jpeg_quality,
+                            self.native_text_min_chars,
+                        )
+                    )
+                    next_page += 1
+
+                page_num = next_page - len(in_flight) + 1
+                try:
+                    content, dimensions, render_time = await in_flight.popleft()
+                except Exception as e:
+                    logger.error(
+                        "pdf_extraction_failed", page_number=page_num, error=str(e)
+                    )
+                    raise PDFProcessingError("Failed to extract pages from PDF")
 
                 # Create processing metadata
                 metadata = ProcessingMetadata(
-                    processing_time=time.time() - page_start,
-                    image_dimensions=(pil_image.width, pil_image.height),
-                    file_size=len(image_bytes),
+                    processing_time=render_time,
+                    image_dimensions=dimensions,
+                    file_size=len(content),
+                    additional_data=(
+                        {"source": "native_text"} if isinstance(content, str) else None
+                    ),
                 )
 
-                pages_data.append((page_num + 1, image_bytes, metadata))
-
-                # Clean up
-                pix = None
-                pil_image.close()
-                output_buffer.close()
-
                 logger.debug(
                     "page_extracted",
-                    page_number=page_num + 1,
+                    page_number=page_num,
                     processing_time=metadata.processing_time,
-                    image_size=len(image_bytes),
+                    image_size=len(content),
+                    native_text=isinstance(content, str),
                 )
 
-            doc.close()
+                yield page_num, content, metadata
 
-            total_time = time.time() - start_time
-            logger.info(
-                "pdf_extraction_complete",
-                total_pages=len(pages_data),
-                total_time=total_time,
-            )
+        finally:
+            for future in in_flight:
+                future.cancel()
 
-            return pages_data
-
-        except Exception as e:
-            logger.error("pdf_extraction_failed", error=str(e))
-            raise PDFProcessingError(f"Failed to extract pages from PDF: {str(e)}")
+        total_time = time.perf_counter() - start_time
+        logger.info(
+            "pdf_extraction_complete",
+            total_pages=page_count,
+            total_time=total_time,
+        )
 
     async def process_pdf_stream(
-        self, file: BinaryIO
-    ) -> List[Tuple[int, bytes, ProcessingMetadata]]:
-        """Process PDF from file stream."""
-        try:
-            # Read file content
-            content = await self._read_file_async(file)
+        self, pdf_path: str
+    ) -> AsyncIterator[Tuple[int, PageContent, ProcessingMetadata]]:
+        """Validate a spooled PDF and return a page iterator.
 
+        The file must stay in place until the iterator is exhausted.
+        """
+        try:
             # Validate PDF
-            await self.validate_pdf(content)
-
-            # Extract pages
-            return await self.extract_pages_as_images(content)
+            await self.validate_pdf(pdf_path)
 
         except Exception as e:
             logger.error("pdf_stream_processing_failed", error=str(e))
             raise
 
-    async def _read_file_async(self, file: BinaryIO) -> bytes:
-        """Read file content asynchronously."""
-        # Create temporary file to handle large uploads
-        with tempfile.NamedTemporaryFile(delete=False) as tmp_file:
-            try:
-                # Read in chunks to handle large files
-                chunk_size = 8192
-                while chunk := file.read(chunk_size):
-                    tmp_file.write(chunk)
-
-                tmp_file.flush()
-
-                # Read back the complete content
-                async with aiofiles.open(tmp_file.name, "rb") as f:
-                    content = await f.read()
-
-                return content
-
-            finally:
-                # Clean up temporary file
-                try:
-                    os.unlink(tmp_file.name)
-                except OSError:
-                    pass
+        # Extract pages lazily
+        return self.aiter_pages_as_images(pdf_path)
@@ -26,7 +26,27 @@ class FileSizeError(PDFProcessingError):
 class APICallError(PDFProcessingError):
     """Raised when OpenAI API call fails."""
 
-    pass
+    def __init__(
+        self,
+        message: str,
+        details: Optional[str] = None,
+        status_code: Optional[int] = None,
+    ):
+        self.status_code = status_code
+        super().__init__(message, details)
+
+
+class TransientAPIError(APICallError):
+    """Raised when an OpenAI API call fails in a way that may succeed on retry."""
+
+    def __init__(
+        self,
+        message: str,
+        details: Optional[str] = None,
+        retry_after: Optional[float] = None,
+    ):
+        self.retry_after = retry_after
+        super().__init__(message, details)
 
 
 class ProcessingTimeoutError(PDFProcessingError):
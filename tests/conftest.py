@@ -0,0 +1,85 @@
+import asyncio
+import os
+from typing import Any, Callable, Dict, Optional, Union
+
+import pytest
+
+# Settings are read at import time; provide the required values for tests
+os.environ.setdefault("OPENAI_API_KEY", "test-key")
+os.environ.setdefault("OPENAI_API_URL", "http://openai.test/v1/chat/completions")
+os.environ.setdefault("MMLM_MODEL", "test-model")
+
+import orjson  # noqa: E402
+
+from app.services.openai_client import OpenAIClient  # noqa: E402
+
+TOKENS_PER_PAGE = 10
+
+
+def transcribe(page_number: Union[int, list[int]]) -> Dict[str, Any]:
+    """Chat-completion response transcribing each requested page as ``page N``."""
+    if isinstance(page_number, list):
+        content = orjson.dumps(
+            {str(index): f"page {page}" for index, page in enumerate(page_number, 1)}
+        ).decode()
+        tokens = TOKENS_PER_PAGE * len(page_number)
+    else:
+        content = f"page {page_number}"
+        tokens = TOKENS_PER_PAGE
+    return {
+        "choices": [
+            {
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"total_tokens": tokens},
+    }
+
+
+class StubAPI:
+    """Stands in for ``OpenAIClient._send_request``, recording every call.
+
+    ``handler`` builds the response (or raises) for the requested page
+    numbers; while ``gate`` is set and not released, calls block on it.
+    """
+
+    def __init__(self):
+        self.calls: list[Union[int, list[int]]] = []
+        self.handler: Callable[[Union[int, list[int]]], Dict[str, Any]] = transcribe
+        self.gate: Optional[asyncio.Event] = None
+
+    async def __call__(
+        self, body: bytes, page_number: Union[int, list[int]]
+    ) -> Dict[str, Any]:
+        self.calls.append(page_number)
+        if self.gate is not None:
+            await self.gate.wait()
+        return self.handler(page_number)
+
+    async def wait_for_calls(self, count: int) -> None:
+        """Let other tasks run until ``count`` calls have been made."""
+        for _ in range(100):
+            if len(self.calls) >= count:
+                return
+            await asyncio.sleep(0)
+        raise AssertionError(f"expected {count} calls, got {self.calls}")
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def api() -> StubAPI:
+    return StubAPI()
+
+
+@pytest.fixture
+def client(api: StubAPI) -> OpenAIClient:
+    client = OpenAIClient()
+    client.response_cache_size = 16
+    client.retry_initial_delay = 0
+    client._send_request = api
+    return client
@@ -0,0 +1,154 @@
+import pytest
+
+from app.models.schemas import ProcessingMetadata
+from app.services.openai_client import _split_usage, parse_batch_transcriptions
+from app.utils.exceptions import APICallError, TransientAPIError
+
+from tests.conftest import TOKENS_PER_PAGE, transcribe
+
+pytestmark = pytest.mark.anyio
+
+
+def _response(content):
+    return {"choices": [{"message": {"content": content}}]}
+
+
+def _group(*images):
+    return [
+        (page_num, image_data, ProcessingMetadata())
+        for page_num, image_data in enumerate(images, 1)
+    ]
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '{"1": "first", "2": "second"}',
+        '```json\n{"1": "first", "2": "second"}\n```',
+        '\n```\n{"2": "second", "1": "first"}\n```\n',
+    ],
+)
+def test_parse_batch_transcriptions(content):
+    assert parse_batch_transcriptions(_response(content), 2) == ["first", "second"]
+
+
+@pytest.mark.parametrize(
+    "response_data",
+    [
+        _response('{"1": "first"}'),
+        _response('{"1": "first", "2": null}'),
+        _response('["first", "second"]'),
+        _response("first\n\nsecond"),
+        {"choices": []},
+    ],
+)
+def test_parse_batch_transcriptions_rejects_malformed_responses(response_data):
+    with pytest.raises(ValueError):
+        parse_batch_transcriptions(response_data, 2)
+
+
+def test_split_usage_adds_up_to_batch_total():
+    usage = {
+        "prompt_tokens": 100,
+        "completion_tokens": 8,
+        "total_tokens": 108,
+        "prompt_tokens_details": {"cached_tokens": 0},
+    }
+
+    shares = _split_usage(usage, 3)
+
+    assert [share["prompt_tokens"] for share in shares] == [34, 33, 33]
+    assert [share["completion_tokens"] for share in shares] == [3, 3, 2]
+    assert sum(share["total_tokens"] for share in shares) == 108
+    for share in shares:
+        assert share["total_tokens"] == (
+            share["prompt_tokens"] + share["completion_tokens"]
+        )
+        assert "prompt_tokens_details" not in share
+
+
+def test_split_usage_without_usage():
+    assert _split_usage({}, 2) == [{}, {}]
+
+
+async def test_batch_splits_response_per_page(client, api):
+    results = await client._process_page_group(_group(b"a", b"b", b"c"))
+
+    assert api.calls == [[1, 2, 3]]
+    for page_num, response_data, metadata, error in results:
+        assert error is None
+        assert response_data["choices"][0]["message"]["content"] == f"page {page_num}"
+        assert response_data["usage"] == {"total_tokens": TOKENS_PER_PAGE}
+        assert "batch_pages" not in response_data
+        assert metadata.additional_data["api_batch_pages"] == [1, 2, 3]
+        assert metadata.additional_data["api_tokens_shared"] is True
+
+    # Batched responses are cached per page
+    await client.process_image(b"b", 4, ProcessingMetadata())
+    assert api.calls == [[1, 2, 3]]
+
+
+async def test_duplicate_page_in_group_shares_batched_response(client, api):
+    results = await client._process_page_group(_group(b"a", b"a", b"b"))
+
+    assert api.calls == [[1, 3]]
+    results = {page_num: result for page_num, *result in results}
+    response_data, metadata, error = results[2]
+    assert error is None
+    assert response_data["choices"][0]["message"]["content"] == "page 1"
+    assert metadata.additional_data["cache_hit"] is True
+
+
+async def test_unsplittable_batch_falls_back_per_page(client, api):
+    def unparseable(page_number):
+        if isinstance(page_number, list):
+            return _response("first\n\nsecond")
+        return transcribe(page_number)
+
+    api.handler = unparseable
+    results = await client._process_page_group(_group(b"a", b"b"))
+
+    assert api.calls == [[1, 2], 1, 2]
+    assert [error for _, _, _, error in results] == [None, None]
+
+
+@pytest.mark.parametrize("status_code", [400, 413, 422])
+async def test_rejected_batch_falls_back_per_page(client, api, status_code):
+    def reject_batches(page_number):
+        if isinstance(page_number, list):
+            raise APICallError("rejected", status_code=status_code)
+        return transcribe(page_number)
+
+    api.handler = reject_batches
+    results = await client._process_page_group(_group(b"a", b"b"))
+
+    assert api.calls == [[1, 2], 1, 2]
+    assert [error for _, _, _, error in results] == [None, None]
+
+
+@pytest.mark.parametrize("status_code", [401, 403, 404])
+async def test_auth_and_routing_errors_fail_whole_batch(client, api, status_code):
+    def reject(page_number):
+        raise APICallError("rejected", status_code=status_code)
+
+    api.handler = reject
+    results = await client._process_page_group(_group(b"a", b"b"))
+
+    assert api.calls == [[1, 2]]
+    assert [error for _, _, _, error in results] == ["rejected", "rejected"]
+    assert not client._response_cache
+
+
+async def test_exhausted_retries_fail_whole_batch(client, api):
+    def unavailable(page_number):
+        raise TransientAPIError("unavailable")
+
+    client.max_retries = 2
+    api.handler = unavailable
+    results = await client._process_page_group(_group(b"a", b"b"))
+
+    assert api.calls == [[1, 2], [1, 2]]
+    for _, response_data, _, error in results:
+        assert response_data == {}
+        assert error == "unavailable (gave up after 2 attempts)"
+    assert not client._response_cache
@@ -0,0 +1,129 @@
+import asyncio
+
+import pytest
+
+from app.models.schemas import ProcessingMetadata
+from app.utils.exceptions import APICallError
+
+from tests.conftest import TOKENS_PER_PAGE, transcribe
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_identical_pages_share_one_request(client, api):
+    api.gate = asyncio.Event()
+    owner = asyncio.create_task(client.process_image(b"page", 1, ProcessingMetadata()))
+    await api.wait_for_calls(1)
+    waiter = asyncio.create_task(client.process_image(b"page", 2, ProcessingMetadata()))
+    await asyncio.sleep(0)
+    api.gate.set()
+
+    (owner_response, owner_metadata), (
+        waiter_response,
+        waiter_metadata,
+    ) = await asyncio.gather(owner, waiter)
+
+    assert api.calls == [1]
+    assert waiter_response == owner_response
+    assert owner_metadata.additional_data["cache_hit"] is False
+    assert owner_metadata.additional_data["api_response_tokens"] == TOKENS_PER_PAGE
+    assert waiter_metadata.additional_data["cache_hit"] is True
+
+
+async def test_cache_hit_reports_no_tokens_used(client, api):
+    await client.process_image(b"page", 1, ProcessingMetadata())
+    _, metadata = await client.process_image(b"page", 2, ProcessingMetadata())
+
+    assert api.calls == [1]
+    assert metadata.additional_data["api_response_tokens"] == 0
+    assert metadata.additional_data["cached_response_tokens"] == TOKENS_PER_PAGE
+
+
+async def test_disabled_cache_sends_every_page(client, api):
+    client.response_cache_size = 0
+
+    await client.process_image(b"page", 1, ProcessingMetadata())
+    await client.process_image(b"page", 2, ProcessingMetadata())
+
+    assert api.calls == [1, 2]
+    assert not client._response_cache
+
+
+async def test_waiter_resends_when_owner_is_cancelled(client, api):
+    api.gate = asyncio.Event()
+    owner = asyncio.create_task(client.process_image(b"page", 1, ProcessingMetadata()))
+    await api.wait_for_calls(1)
+    waiter = asyncio.create_task(client.process_image(b"page", 2, ProcessingMetadata()))
+    await asyncio.sleep(0)
+
+    owner.cancel()
+    await api.wait_for_calls(2)
+    api.gate.set()
+    response, metadata = await waiter
+
+    assert owner.cancelled()
+    assert api.calls == [1, 2]
+    assert response == transcribe(2)
+    assert metadata.additional_data["cache_hit"] is False
+
+
+async def test_api_error_reaches_waiters_and_evicts_entry(client, api):
+    def reject(page_number):
+        raise APICallError("rejected", status_code=400)
+
+    api.handler = reject
+    api.gate = asyncio.Event()
+    owner = asyncio.create_task(client.process_image(b"page", 1, ProcessingMetadata()))
+    await api.wait_for_calls(1)
+    waiter = asyncio.create_task(client.process_image(b"page", 2, ProcessingMetadata()))
+    await asyncio.sleep(0)
+    api.gate.set()
+
+    results = await asyncio.gather(owner, waiter, return_exceptions=True)
+    assert [str(result) for result in results] == ["rejected", "rejected"]
+    assert not client._response_cache
+
+    # The failure is not cached; the next identical page tries again
+    api.handler = transcribe
+    await client.process_image(b"page", 3, ProcessingMetadata())
+    assert api.calls == [1, 3]
+
+
+async def test_lru_eviction_of_in_flight_entry_keeps_its_result(client, api):
+    client.response_cache_size = 1
+    api.gate = asyncio.Event()
+    first = asyncio.create_task(client.process_image(b"a", 1, ProcessingMetadata()))
+    await api.wait_for_calls(1)
+    second = asyncio.create_task(client.process_image(b"b", 2, ProcessingMetadata()))
+    await api.wait_for_calls(2)
+
+    assert list(client._response_cache) == [client._cache_key(b"b")]
+    api.gate.set()
+    (first_response, _), (second_response, _) = await asyncio.gather(first, second)
+    assert first_response == transcribe(1)
+    assert second_response == transcribe(2)
+
+    # The evicted page is sent again; the retained one is served from cache
+    await client.process_image(b"a", 3, ProcessingMetadata())
+    await client.process_image(b"a", 4, ProcessingMetadata())
+    assert api.calls == [1, 2, 3]
+
+
+async def test_failure_of_evicted_entry_keeps_newer_entry(client, api):
+    def reject_first(page_number):
+        if page_number == 1:
+            raise APICallError("rejected", status_code=400)
+        return transcribe(page_number)
+
+    client.response_cache_size = 1
+    api.handler = reject_first
+    api.gate = asyncio.Event()
+    first = asyncio.create_task(client.process_image(b"a", 1, ProcessingMetadata()))
+    await api.wait_for_calls(1)
+    second = asyncio.create_task(client.process_image(b"b", 2, ProcessingMetadata()))
+    await api.wait_for_calls(2)
+    api.gate.set()
+
+    results = await asyncio.gather(first, second, return_exceptions=True)
+    assert isinstance(results[0], APICallError)
+    assert list(client._response_cache) == [client._cache_key(b"b")]